@@ -3,54 +3,128 @@
 # dataclass keeps event payloads lightweight, structured, and serializable.
 from dataclasses import dataclass, field
 from decimal import Decimal             # Decimal mirrors the precision of the order entities for price/size fields.
-# datetime stamps events so downstream consumers can order them if needed.
+# datetime renders the captured wall clock lazily, only for consumers that ask for it.
 from datetime import datetime, timezone
+# time.time_ns stamps events built outside the book, which supplies its own per-call reading.
+from time import time_ns
 # typing aids readability for optional payloads (e.g., textual reason codes).
 from typing import Optional
 
-# Import the order type to embed copies of accepted orders in events.
-from app.engine.order import Order
+# Events copy order attributes by value, so only the shared enums are needed here.
+from app.schema import Side, TimeInForce, ticks_to_price, ticks_to_qty
 
 
-def _now() -> datetime:
-    """Helper returning a timezone-aware timestamp for event emission."""
+# Tags opening the tuple records emitted by ``OrderBook.submit_records``/``cancel_records``.
+# Amounts in records stay in integer ticks; :func:`to_event` builds the typed event.
+#   (TRADE, maker_order_id, taker_order_id, price, quantity, seq, wall_time_ns)
+#   (ACCEPTED, order_id, side, price, quantity, remaining_quantity, time_in_force, user_data,
+#    seq, wall_time_ns)
+#   (CANCELLED, order_id, remaining_quantity, reason, seq, wall_time_ns)
+#   (REJECTED, order_id, reason, seq, wall_time_ns)
+TRADE = "TRADE"
+ACCEPTED = "ACCEPTED"
+CANCELLED = "CANCELLED"
+REJECTED = "REJECTED"
 
-    return datetime.now(timezone.utc)
+
+def _from_ns(wall_time_ns: int) -> datetime:
+    """Helper turning a captured ``time.time_ns()`` reading into a timezone-aware timestamp."""
+
+    return datetime.fromtimestamp(wall_time_ns / 1_000_000_000, tz=timezone.utc)
+
+
+class _Stamped:
+    """Mixin for events carrying a sequence number and a lazily rendered wall-clock time.
+
+    ``seq`` is a per-book monotonic counter that orders events; ``wall_time_ns`` is read once
+    per book call and shared by every event that call emits. Events built outside the book
+    default to sequence ``0`` and the current time.
+    """
+
+    # Cache for the rendered timestamp; left unset until first read.
+    __slots__ = ("_timestamp",)
+
+    @property
+    def timestamp(self) -> datetime:
+        """Wall-clock time of the book call that emitted the event, rendered once on first read."""
+
+        try:
+            return self._timestamp
+        except AttributeError:
+            self._timestamp = _from_ns(self.wall_time_ns)
+            return self._timestamp
 
 
 @dataclass(slots=True)
-class OrderAccepted:
-    """Published when a new order is accepted onto the book."""
+class OrderAccepted(_Stamped):
+    """Published when a new order is accepted onto the book.
+
+    Carries a copy of the order's attributes rather than the order itself, so the event
+    stays valid after the order is filled, cancelled or recycled through an ``OrderPool``.
+    """
 
-    order: Order
-    timestamp: datetime = field(default_factory=_now)
+    order_id: int
+    side: Side
+    price: Decimal
+    quantity: Decimal
+    remaining_quantity: Decimal
+    time_in_force: TimeInForce
+    user_data: Optional[dict] = None
+    seq: int = 0
+    wall_time_ns: int = field(default_factory=time_ns)
 
 
 @dataclass(slots=True)
-class Trade:
+class Trade(_Stamped):
     """Represents an execution occurring between a resting and an aggressive order."""
 
-    maker_order_id: str
-    taker_order_id: str
+    maker_order_id: int
+    taker_order_id: int
     price: Decimal
     quantity: Decimal
-    timestamp: datetime = field(default_factory=_now)
+    seq: int = 0
+    wall_time_ns: int = field(default_factory=time_ns)
 
 
 @dataclass(slots=True)
-class OrderCancelled:
+class OrderCancelled(_Stamped):
     """Signals that an order has been cancelled and removed from the book."""
 
-    order_id: str
+    order_id: int
     remaining_quantity: Decimal
     reason: Optional[str] = None
-    timestamp: datetime = field(default_factory=_now)
+    seq: int = 0
+    wall_time_ns: int = field(default_factory=time_ns)
 
 
 @dataclass(slots=True)
-class OrderRejected:
+class OrderRejected(_Stamped):
     """Indicates the order could not be accepted for business reasons."""
 
-    order_id: str
+    order_id: int
     reason: str
-    timestamp: datetime = field(default_factory=_now)
+    seq: int = 0
+    wall_time_ns: int = field(default_factory=time_ns)
+
+
+def to_event(record: tuple) -> object:
+    """Build the typed event matching a tuple record emitted by the order book."""
+
+    tag = record[0]
+    if tag == TRADE:
+        _, maker_order_id, taker_order_id, price, quantity, seq, wall_time_ns = record
+        return Trade(
+            maker_order_id, taker_order_id, ticks_to_price(price), ticks_to_qty(quantity), seq, wall_time_ns,
+        )
+    if tag == ACCEPTED:
+        _, order_id, side, price, quantity, remaining_quantity, time_in_force, user_data, seq, wall_time_ns = record
+        return OrderAccepted(
+            order_id, side, ticks_to_price(price), ticks_to_qty(quantity), ticks_to_qty(remaining_quantity),
+            time_in_force, user_data, seq, wall_time_ns,
+        )
+    if tag == CANCELLED:
+        _, order_id, remaining_quantity, reason, seq, wall_time_ns = record
+        return OrderCancelled(order_id, ticks_to_qty(remaining_quantity), reason, seq, wall_time_ns)
+    if tag == REJECTED:
+        return OrderRejected(*record[1:])
+    raise ValueError(f"unknown event record tag: {tag!r}")
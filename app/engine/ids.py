@@ -0,0 +1,57 @@
+"""Translation between external (client-facing) order IDs and the engine's integer IDs."""
+
+# typing annotations document the two directions of the mapping.
+from typing import Dict, List, Optional
+
+
+class IdRegistry:
+    """Assigns dense integer IDs to external string order IDs at the API boundary.
+
+    The book keys its order registry and events by these ints, which hash and compare
+    faster than strings; callers translate back with :meth:`decode` when reporting.
+    Internal IDs are never handed out twice, so stored events always decode to the
+    client that placed the order. :meth:`release` only drops the external -> internal
+    entry of a finished order, keeping the lookup table sized to the live orders.
+    """
+
+    def __init__(self) -> None:
+        # External ID -> internal ID for live orders, and the reverse as a list indexed
+        # by internal ID (kept for every ID ever assigned).
+        self._internal: Dict[str, int] = {}
+        self._external: List[str] = []
+
+    def encode(self, external_id: str) -> int:
+        """Return the internal ID for `external_id`, assigning a fresh one if new."""
+
+        internal_id = self._internal.get(external_id)
+        if internal_id is None:
+            internal_id = len(self._external)
+            self._external.append(external_id)
+            self._internal[external_id] = internal_id
+        return internal_id
+
+    def lookup(self, external_id: str) -> Optional[int]:
+        """Return the internal ID for `external_id` without assigning one (e.g. for cancels)."""
+
+        return self._internal.get(external_id)
+
+    def decode(self, internal_id: int) -> str:
+        """Return the external ID an internal ID was assigned to."""
+
+        return self._external[internal_id]
+
+    def release(self, internal_id: int) -> None:
+        """Forget the live mapping for a finished order; its internal ID is not reused.
+
+        Unknown or already released IDs are ignored, as is an ID whose external ID has
+        since been encoded again.
+        """
+
+        if not 0 <= internal_id < len(self._external):
+            return
+        external_id = self._external[internal_id]
+        if self._internal.get(external_id) == internal_id:
+            del self._internal[external_id]
+
+    def __len__(self) -> int:
+        return len(self._internal)
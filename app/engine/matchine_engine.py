@@ -1,37 +1,133 @@
 """Service layer responsible for orchestrating the order book and event publishing."""
 
+# contextmanager turns the GC-suspending batch helper into a ``with`` block.
+from contextlib import contextmanager
+# gc lets throughput-sensitive callers suspend cyclic collection around bulk submissions.
+import gc
 # typing.Callable lets us accept any callable event sink without imposing a concrete bus.
-from typing import Callable, Iterable, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Import the order entity and book implementation that do the heavy lifting.
-from app.engine.order import Order
+from app.engine.ids import IdRegistry
+from app.engine.order import Order, OrderPool
 from app.engine.orderbook import OrderBook
 
 
 class MatchingEngine:
     """Thin façade that routes orders to the book and broadcasts resulting events."""
 
-    def __init__(self, publish: Optional[Callable[[object], None]] = None) -> None:
+    def __init__(
+        self,
+        publish: Optional[Callable[[object], None]] = None,
+        publish_batch: Optional[Callable[[List[object]], None]] = None,
+        order_pool: Optional[OrderPool] = None,
+        typed_events: bool = True,
+    ) -> None:
         # Allow dependency-injected publisher; default to a no-op lambda for standalone usage.
         self._publish = publish or (lambda event: None)
-        self._book = OrderBook()
+        # A batch sink receives each call's whole event list at once; otherwise fan out per event.
+        self._publish_batch = publish_batch or self._publish_each
+        # Orders submitted through the engine, by ID; when the book retires one of them its
+        # ID is released (and, with a pool, the order recycled) once the call's events have
+        # been published. Orders that reached the book some other way are left alone.
+        self._pool = order_pool
+        self._live: Dict[int, Order] = {}
+        self._retired: List[Order] = []
+        # Maps client order IDs to the integer IDs the book works with.
+        self._ids = IdRegistry()
+        self._book = OrderBook(on_retire=self._on_retire)
+        # Publishers that handle tuple records directly skip building the typed event dataclasses.
+        if typed_events:
+            self._submit, self._cancel = self._book.submit, self._book.cancel
+        else:
+            self._submit, self._cancel = self._book.submit_records, self._book.cancel_records
+
+    def new_order(self, *args, **kwargs) -> Order:
+        """Build an order from `Order` fields, drawing from the pool when one is configured."""
+
+        if self._pool is None:
+            return Order(*args, **kwargs)
+        return self._pool.acquire(*args, **kwargs)
 
     def submit_order(self, order: Order) -> Iterable[object]:
         """Send an order into the book and forward emitted events to the publisher."""
 
-        events = self._book.submit(order)
-        for event in events:
-            self._publish(event)
+        self._live[order.order_id] = order
+        events = self._submit(order)
+        self._publish_batch(events)
+        self._recycle()
         return events
 
-    def cancel_order(self, order_id: str, reason: str = "user_request") -> Iterable[object]:
-        """Request cancellation of an order and propagate resulting events."""
+    def cancel_order(self, order_id: Optional[int], reason: str = "user_request") -> Iterable[object]:
+        """Request cancellation of an order and propagate resulting events.
 
-        events = self._book.cancel(order_id, reason=reason)
-        for event in events:
-            self._publish(event)
+        ``order_id`` is typically ``engine.ids.lookup(external_id)``; ``None`` (an ID the
+        registry has never seen) is rejected as an unknown order.
+        """
+
+        events = self._cancel(order_id, reason=reason)
+        self._publish_batch(events)
+        self._recycle()
         return events
 
+    def replay(self, rows: Iterable[Tuple[int, int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        """Run :meth:`OrderBook.replay` on this engine's book and return its trades.
+
+        Nothing is published. The cyclic collector is suspended as in :meth:`batch`, and
+        client orders filled by the replay have their IDs released afterwards. Replayed
+        orders never take IDs from :attr:`ids`.
+        """
+
+        with self.batch():
+            trades = self._book.replay(rows)
+        self._recycle()
+        return trades
+
+    @contextmanager
+    def batch(self) -> Iterator["MatchingEngine"]:
+        """Suspend cyclic garbage collection while submitting a burst of orders.
+
+        Orders, price levels and events form no reference cycles, so the cyclic collector
+        finds nothing to free during matching; its pauses are pure overhead for bulk loads
+        and replays. Reference counting still frees everything as usual. The previous
+        collector state is restored on exit.
+        """
+
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            yield self
+        finally:
+            if was_enabled:
+                gc.enable()
+
+    def _publish_each(self, events: List[object]) -> None:
+        """Fallback batch publisher forwarding events one at a time to ``publish``."""
+
+        publish = self._publish
+        for event in events:
+            publish(event)
+
+    def _on_retire(self, order: Order) -> None:
+        """Book hook: queue a finished order for recycling if this engine submitted it."""
+
+        if self._live.get(order.order_id) is order:
+            self._retired.append(order)
+
+    def _recycle(self) -> None:
+        """Release the IDs of orders retired during the last call and return them to the pool."""
+
+        if self._retired:
+            live = self._live
+            release_id = self._ids.release
+            pool = self._pool
+            for order in self._retired:
+                del live[order.order_id]
+                release_id(order.order_id)
+                if pool is not None:
+                    pool.release(order)
+            self._retired.clear()
+
     def best_bid(self):
         """Proxy helper to inspect the book's best bid (useful in tests or monitoring)."""
 
@@ -42,6 +138,17 @@ class MatchingEngine:
 
         return self._book.best_ask()
 
+    @property
+    def ids(self) -> IdRegistry:
+        """Registry translating external order IDs to and from the engine's integer IDs.
+
+        Orders submitted to this engine must take their IDs from here. Once an order is
+        filled or cancelled its external ID no longer resolves via :meth:`IdRegistry.lookup`,
+        but :meth:`IdRegistry.decode` keeps working for its events.
+        """
+
+        return self._ids
+
     @property
     def orderbook(self) -> OrderBook:
         """Expose the underlying order book for read-only inspection or advanced workflows."""
@@ -1,75 +1,111 @@
 """Order domain object capturing state required by the matching engine."""
 
 # dataclass supplies concise syntax for domain entities with value semantics.
-from dataclasses import dataclass, field
-# Decimal keeps price/quantity arithmetic precise and avoids floating point drift.
+from dataclasses import InitVar, dataclass, field
+# Decimal is accepted at construction and converted to integer ticks for fast arithmetic.
 from decimal import Decimal
 # datetime stamps an order for time-priority decisions on the book.
 from datetime import datetime, timezone
 # typing annotations clarify optional/return types for readers and tools.
-from typing import Optional
+from typing import List, Optional, Union
 
 # Import shared enumerations so the engine agrees on canonical order metadata.
-from app.schema import OrderType, Side, TimeInForce
-
-
-# Shared zero literal avoids repeatedly constructing Decimal('0') instances.
-DecimalZero = Decimal("0")
+from app.schema import OrderType, Side, TimeInForce, price_to_ticks, qty_to_ticks
 
 
 @dataclass(slots=True)
 class Order:
-    """Represents a single limit order resting on, or submitted to, the book."""
+    """Represents a single limit order resting on, or submitted to, the book.
+
+    ``price`` and ``quantity`` are given in external units (``Decimal``, ``int`` or
+    ``str``) and stored as integer ticks (see :data:`app.schema.PRICE_SCALE` /
+    :data:`app.schema.QTY_SCALE`). Internal callers that already hold ticks use
+    :meth:`from_ticks` (or pass ``in_ticks=True``).
+    """
 
-    order_id: str
+    order_id: int
     side: Side
-    price: Decimal
-    quantity: Decimal
+    price: Union[int, Decimal]
+    quantity: Union[int, Decimal]
     order_type: OrderType = OrderType.LIMIT
     time_in_force: TimeInForce = TimeInForce.GTC
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
-    filled_quantity: Decimal = field(default=DecimalZero)
     user_data: Optional[dict] = None  # Preserve arbitrary metadata for higher layers.
-
-    def __post_init__(self) -> None:
-        """Validate numeric invariants immediately after construction."""
-
-        if self.price <= DecimalZero:
+    # Unfilled size in lot ticks, kept as a plain field so the matching loop reads it directly.
+    remaining: int = field(default=0, init=False)
+    # +1 for buys, -1 for sells; lets price checks use arithmetic instead of branching on side.
+    side_sign: int = field(default=1, init=False, repr=False)
+    # Slot in the owning price level's queue while resting on the book (-1 otherwise).
+    _slot: int = field(default=-1, init=False, repr=False, compare=False)
+    # True for orders handed out by an ``OrderPool``; only those are ever recycled.
+    _pooled: bool = field(default=False, init=False, repr=False, compare=False)
+    # Set when price/quantity are already ticks and must not be scaled again.
+    in_ticks: InitVar[bool] = False
+
+    def __post_init__(self, in_ticks: bool) -> None:
+        """Normalise amounts to ticks and validate numeric invariants after construction."""
+
+        if not in_ticks:
+            self.price = price_to_ticks(self.price)
+            self.quantity = qty_to_ticks(self.quantity)
+        if self.price <= 0:
             raise ValueError("price must be positive")
-        if self.quantity <= DecimalZero:
+        if self.quantity <= 0:
             raise ValueError("quantity must be positive")
         if self.order_type is not OrderType.LIMIT:
             raise ValueError("Only LIMIT orders are supported by this engine version")
+        self.remaining = self.quantity
+        self.side_sign = 1 if self.side is Side.BUY else -1
+
+    @classmethod
+    def from_ticks(cls, order_id: int, side: Side, price: int, quantity: int, **kwargs) -> "Order":
+        """Build an order whose price and quantity are already integer ticks."""
+
+        return cls(order_id, side, price, quantity, in_ticks=True, **kwargs)
+
+    @property
+    def remaining_quantity(self) -> int:
+        """Return the unfilled portion (in lot ticks); alias of :attr:`remaining`."""
+
+        return self.remaining
 
     @property
-    def remaining_quantity(self) -> Decimal:
-        """Return the unfilled portion that can still be matched."""
+    def filled_quantity(self) -> int:
+        """Return the portion (in lot ticks) matched so far."""
 
-        remaining = self.quantity - self.filled_quantity
-        return remaining if remaining > DecimalZero else DecimalZero
+        return self.quantity - self.remaining
 
     @property
     def is_filled(self) -> bool:
         """Convenience flag signaling the order has reached zero remaining size."""
 
-        return self.remaining_quantity == DecimalZero
+        return self.remaining == 0
 
-    def apply_fill(self, filled: Decimal) -> Decimal:
-        """Reduce remaining quantity by `filled` and return the actual amount applied."""
+    def apply_fill(self, filled: int) -> int:
+        """Reduce remaining quantity by `filled` ticks and return the actual amount applied."""
 
-        if filled <= DecimalZero:
+        if filled <= 0:
             raise ValueError("filled must be positive")
-        actual_fill = min(filled, self.remaining_quantity)
-        self.filled_quantity += actual_fill
+        actual_fill = min(filled, self.remaining)
+        self.remaining -= actual_fill
         return actual_fill
 
+    def _unchecked_fill(self, filled: int) -> None:
+        """Apply a fill the caller guarantees is positive and within :attr:`remaining`.
+
+        The matching loop already sizes each trade as the smaller of both remainders, so
+        it skips the validation and clamping :meth:`apply_fill` performs for other callers.
+        """
+
+        self.remaining -= filled
+
     def clone_for_remainder(self) -> "Order":
         """Produce a shallow copy capturing leftover state (useful for IOC rejection)."""
 
-        remainder = self.remaining_quantity
-        if remainder <= DecimalZero:
+        remainder = self.remaining
+        if remainder <= 0:
             raise ValueError('order is fully filled; nothing to clone')
-        return Order(
+        return Order.from_ticks(
             order_id=self.order_id,
             side=self.side,
             price=self.price,
@@ -77,6 +113,46 @@ class Order:
             order_type=self.order_type,
             time_in_force=self.time_in_force,
             created_at=self.created_at,
-            filled_quantity=DecimalZero,
             user_data=self.user_data.copy() if isinstance(self.user_data, dict) else self.user_data,
         )
+
+
+class OrderPool:
+    """Free list of retired orders that can be re-armed instead of allocated afresh.
+
+    Orders go back to the pool once the engine has published their final events. Events
+    copy order attributes by value, so recycling never changes an already published event;
+    callers must not keep using an order object themselves after it has been retired.
+    """
+
+    def __init__(self, size: int = 0) -> None:
+        # Pre-allocate bare instances; ``acquire`` runs the full initialiser on them.
+        self._free: List[Order] = [Order.__new__(Order) for _ in range(size)]
+
+    def acquire(self, *args, **kwargs) -> Order:
+        """Return an order built from the given `Order` fields, reusing a pooled instance if any.
+
+        Amounts are external units as for ``Order(...)``; pass ``in_ticks=True`` for ticks.
+        """
+
+        if not self._free:
+            order = Order(*args, **kwargs)
+        else:
+            order = self._free.pop()
+            try:
+                order.__init__(*args, **kwargs)
+            except Exception:
+                # Whatever the arguments raised, the instance stays pooled.
+                self._free.append(order)
+                raise
+        order._pooled = True
+        return order
+
+    def release(self, order: Order) -> None:
+        """Hand a filled or cancelled order back for reuse; orders not from ``acquire`` are ignored."""
+
+        if order._pooled:
+            self._free.append(order)
+
+    def __len__(self) -> int:
+        return len(self._free)
@@ -3,193 +3,382 @@
 # Future annotations avoid evaluation of type hints at import-time, keeping the module lightweight.
 from __future__ import annotations
 
-# bisect maintains a sorted list of price levels with logarithmic insert/find behaviour.
-from bisect import bisect_left
-# deque offers O(1) FIFO operations for orders queued at each price level.
-from collections import deque
-# Decimal mirrors the financial precision established on the Order entity.
+# abc marks the one hook each concrete book side must provide.
+from abc import ABC, abstractmethod
+# Decimal is only used at the boundary; the book itself works in integer ticks.
 from decimal import Decimal
+# itertools.count hands out the book's monotonic event sequence numbers.
+from itertools import count
+# time.time_ns is read once per book call to stamp that call's events.
+from time import time_ns
 # typing primitives document function contracts and aid static tooling.
-from typing import Deque, Dict, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# SortedDict keeps price levels ordered with logarithmic insert/delete and cheap access to either end.
+from sortedcontainers import SortedDict
 
 # Import domain objects and events so the book can both consume orders and emit outcomes.
-from app.engine.events import OrderAccepted, OrderCancelled, OrderRejected, Trade
+from app.engine.events import ACCEPTED, CANCELLED, REJECTED, TRADE, to_event
 from app.engine.order import Order
-from app.schema import Side, TimeInForce
+from app.schema import Side, TimeInForce, ticks_to_price
+
+
+# Integer encodings of side and time-in-force used by replay rows.
+_REPLAY_SIDES = {1: Side.BUY, -1: Side.SELL}
+_REPLAY_TIFS = {0: TimeInForce.GTC, 1: TimeInForce.IOC}
+
+
+class _PriceLevel:
+    """FIFO queue of orders at one price, kept as a flat list with a moving head cursor.
+
+    Orders are never shifted on removal: fills advance ``head`` and cancels leave a ``None``
+    tombstone that the cursor skips, so both are O(1). The consumed prefix is compacted
+    lazily once it makes up more than half of the list.
+    """
+
+    __slots__ = ("price", "orders", "head", "live", "base")
+
+    def __init__(self, price: int) -> None:
+        self.price = price
+        self.orders: List[Optional[Order]] = []
+        # Index of the first live order; meaningful only while ``live`` is non-zero.
+        self.head = 0
+        # Number of live (non-tombstoned) orders queued at this price.
+        self.live = 0
+        # Slots already compacted away; an order's list index is ``order._slot - base``.
+        self.base = 0
+
+    def append(self, order: Order) -> None:
+        """Queue an order behind everything already resting at this price."""
+
+        # Remember the slot on the order itself so cancels can tombstone without scanning.
+        order._slot = self.base + len(self.orders)
+        self.orders.append(order)
+        self.live += 1
+
+    def popleft(self) -> None:
+        """Retire the head order after it has been completely filled."""
+
+        self.orders[self.head]._slot = -1
+        self.orders[self.head] = None
+        self.live -= 1
+        self._settle()
+
+    def remove(self, order: Order) -> None:
+        """Tombstone `order`, wherever it sits in the queue."""
+
+        self.orders[order._slot - self.base] = None
+        order._slot = -1
+        self.live -= 1
+        self._settle()
+
+    def _settle(self) -> None:
+        """Move the head cursor past tombstones and compact the consumed prefix if large."""
+
+        orders = self.orders
+        head = self.head
+        size = len(orders)
+        while head < size and orders[head] is None:
+            head += 1
+        if head > size >> 1:
+            del orders[:head]
+            self.base += head
+            head = 0
+        self.head = head
+
+    def __iter__(self) -> Iterator[Order]:
+        for order in self.orders[self.head:]:
+            if order is not None:
+                yield order
+
+
+def _match_level(
+    level: _PriceLevel,
+    order: Order,
+    emit: Callable[[tuple], None],
+    drop_order: Callable[[Order], None],
+    next_seq: Callable[[], int],
+    now: int,
+) -> None:
+    """Fill `order` against `level` head-first until either the taker or the level runs out.
+
+    The caller has already checked that the level's price crosses, so the kernel walks the
+    queue without touching the sorted price index or re-checking the price per fill.
+    """
+
+    taker_id = order.order_id
+    price = level.price
+    orders = level.orders
+    while True:
+        best = orders[level.head]
+        traded = min(order.remaining, best.remaining)
+        best._unchecked_fill(traded)
+        order._unchecked_fill(traded)
+        emit((TRADE, best.order_id, taker_id, price, traded, next_seq(), now))
+        if best.remaining:
+            # The taker ran out first; the partially filled maker keeps its place.
+            return
+        level.popleft()
+        drop_order(best)
+        if not order.remaining or not level.live:
+            return
+
+
+def _accepted(order: Order, seq: int, now: int) -> tuple:
+    """Build the ACCEPTED record, copying the order's attributes by value."""
 
+    return (
+        ACCEPTED, order.order_id, order.side, order.price, order.quantity, order.remaining,
+        order.time_in_force, order.user_data, seq, now,
+    )
 
-class OrderBookSide:
-    """Maintains the active orders for a single side (bid or ask) of the book."""
 
-    def __init__(self, side: Side) -> None:
-        # Store whether this side represents buy or sell orders for comparison logic.
-        self.side = side
-        # List of active prices kept sorted ascending for easy best-price calculation.
-        self._prices: List[Decimal] = []
-        # Map from price -> queue of FIFO orders at that level.
-        self._levels: Dict[Decimal, Deque[Order]] = {}
+class OrderBookSide(ABC):
+    """Maintains the active orders for a single side of the book.
+
+    Price levels are sorted ascending by price; :class:`BidSide` and :class:`AskSide` only
+    say which end of ``_levels`` holds the best level and how to iterate in priority order.
+    """
+
+    # Position of the best level in ``_levels``: -1 for bids (highest), 0 for asks (lowest).
+    _BEST: int
+
+    def __init__(self) -> None:
+        # Map from price ticks -> queue of FIFO orders at that level, sorted ascending by price.
+        self._levels: SortedDict[int, _PriceLevel] = SortedDict()
+        # Cached top-of-book pointer; ``None`` means it must be re-read from ``_levels``.
+        self._best_level: Optional[_PriceLevel] = None
 
     def add(self, order: Order) -> None:
         """Insert an order at the end of its price level queue."""
 
         level = self._levels.get(order.price)
         if level is None:
-            # New price level; insert into sorted price list and prime an empty queue.
-            index = bisect_left(self._prices, order.price)
-            self._prices.insert(index, order.price)
-            level = deque()
+            # New price level; the sorted mapping places it without shifting its neighbours.
+            level = _PriceLevel(order.price)
             self._levels[order.price] = level
+            # The new level may now be the best one.
+            self._best_level = None
         level.append(order)
 
-    def best_price(self) -> Optional[Decimal]:
-        """Return the top-of-book price for the side, if present."""
+    def best_level(self) -> Optional[_PriceLevel]:
+        """Return the FIFO queue at the top of book, reusing the cached pointer when valid."""
 
-        if not self._prices:
-            return None
-        return self._prices[-1] if self.side is Side.BUY else self._prices[0]
+        level = self._best_level
+        if level is None:
+            if not self._levels:
+                return None
+            level = self._levels.peekitem(self._BEST)[1]
+            self._best_level = level
+        return level
+
+    def best_price(self) -> Optional[int]:
+        """Return the top-of-book price (in ticks) for the side, if present."""
+
+        level = self.best_level()
+        return None if level is None else level.price
 
     def best_order(self) -> Optional[Order]:
-        """Return the next order eligible for matching while pruning empty queues."""
-
-        price = self.best_price()
-        if price is None:
-            return None
-        level = self._levels.get(price)
-        if not level:
-            # Remove stale level before trying again.
-            self._remove_price(price)
-            return self.best_order()
-        # Ensure the head order still has quantity before returning it.
-        while level and level[0].is_filled:
-            level.popleft()
-        if not level:
-            self._remove_price(price)
-            return self.best_order()
-        return level[0]
+        """Return the next order eligible for matching.
+
+        Fills and cancels advance each level's head past retired orders and empty levels
+        are dropped eagerly, so the head of the best level is always matchable.
+        """
+
+        level = self.best_level()
+        return None if level is None else level.orders[level.head]
 
     def remove_order(self, order: Order) -> None:
-        """Strip an order from its level (used by cancel flows)."""
+        """Strip an order from its level in O(1) via its queue slot (used by cancel flows)."""
 
-        level = self._levels.get(order.price)
-        if not level:
-            return
-        try:
-            level.remove(order)
-        except ValueError:
+        if order._slot < 0:
             return
-        if not level:
+        level = self._levels[order.price]
+        level.remove(order)
+        if not level.live:
             self._remove_price(order.price)
 
-    def _remove_price(self, price: Decimal) -> None:
+    def _remove_price(self, price: int) -> None:
         """Drop bookkeeping for a now-empty price level."""
 
-        if price in self._levels:
-            del self._levels[price]
-        index = bisect_left(self._prices, price)
-        if index < len(self._prices) and self._prices[index] == price:
-            self._prices.pop(index)
+        level = self._levels.pop(price, None)
+        if level is not None and level is self._best_level:
+            self._best_level = None
+
+    def _advance(self) -> Optional[_PriceLevel]:
+        """Drop the exhausted best level and point the cache straight at the next one.
+
+        Popping by position skips the key search ``_remove_price`` needs, and the next
+        level sits at the same end of the sorted mapping.
+        """
 
+        levels = self._levels
+        levels.popitem(self._BEST)
+        level = levels.peekitem(self._BEST)[1] if levels else None
+        self._best_level = level
+        return level
+
+    @abstractmethod
     def all_orders(self) -> Iterable[Order]:
         """Iterate through orders in price-time priority (mainly for diagnostics)."""
 
-        prices = reversed(self._prices) if self.side is Side.BUY else self._prices
-        for price in prices:
-            level = self._levels.get(price)
-            if not level:
-                continue
-            for order in level:
-                if not order.is_filled:
-                    yield order
+
+class BidSide(OrderBookSide):
+    """Buy side: the best level is the highest price, at the end of ``_levels``."""
+
+    _BEST = -1
+
+    def all_orders(self) -> Iterable[Order]:
+        for level in reversed(self._levels.values()):
+            yield from level
+
+
+class AskSide(OrderBookSide):
+    """Sell side: the best level is the lowest price, at the start of ``_levels``."""
+
+    _BEST = 0
+
+    def all_orders(self) -> Iterable[Order]:
+        for level in self._levels.values():
+            yield from level
 
 
 class OrderBook:
     """Coordinates bids and asks while producing domain events for external consumers."""
 
-    def __init__(self) -> None:
+    def __init__(self, on_retire: Optional[Callable[[Order], None]] = None) -> None:
+        # Optional hook told about every order that leaves (or never joins) the book.
+        self._on_retire = on_retire
         # Separate containers keep comparison logic trivial when matching cross-side.
-        self._bids = OrderBookSide(Side.BUY)
-        self._asks = OrderBookSide(Side.SELL)
+        self._bids = BidSide()
+        self._asks = AskSide()
         # Registry of active orders enables constant-time lookup on cancellation.
-        self._orders: Dict[str, Order] = {}
+        self._orders: Dict[int, Order] = {}
+        # Monotonic event sequence shared by every event the book emits.
+        self._next_seq = count(1).__next__
 
     def submit(self, order: Order) -> List[object]:
         """Process an incoming order and return the emitted events."""
 
-        events: List[object] = []
-        opposite = self._asks if order.side is Side.BUY else self._bids
-        same_side = self._bids if order.side is Side.BUY else self._asks
+        return [to_event(record) for record in self.submit_records(order)]
 
-        # Run the core matching loop until either the order is filled or no contra side remains.
-        while order.remaining_quantity > 0:
-            best = opposite.best_order()
-            if best is None:
-                break
-            if not self._crosses(order, best.price):
+    def submit_records(self, order: Order) -> List[tuple]:
+        """Process an incoming order and return the emitted events as tuple records.
+
+        This is the allocation-light form of :meth:`submit` for internal pipelines such as
+        replays; see :mod:`app.engine.events` for the record layouts.
+        """
+
+        events: List[tuple] = []
+        # Resolve the side once.
+        if order.side is Side.BUY:
+            opposite, same_side = self._asks, self._bids
+        else:
+            opposite, same_side = self._bids, self._asks
+
+        # Bind everything the loop touches to locals once: each attribute or method lookup
+        # avoided here is interpreter dispatch saved on every level visited.
+        emit = events.append
+        limit = order.price
+        sign = order.side_sign
+        drop_order = self._drop_order
+        next_seq = self._next_seq
+        # One clock read per submit; every event below shares it.
+        now = time_ns()
+
+        # Walk the contra side level by level; each marketable level is drained by the
+        # kernel until either the order is filled or no crossing liquidity remains. A level
+        # crosses when the limit is on the right side of its price: at or above it for a buy
+        # (sign +1), at or below it for a sell (sign -1).
+        level = opposite.best_level()
+        while level is not None and (limit - level.price) * sign >= 0:
+            _match_level(level, order, emit, drop_order, next_seq, now)
+            if not level.live:
+                # Level exhausted: jump straight to the next one.
+                level = opposite._advance()
+            if not order.remaining:
                 break
-            traded = min(order.remaining_quantity, best.remaining_quantity)
-            best.apply_fill(traded)
-            order.apply_fill(traded)
-            events.append(Trade(
-                maker_order_id=best.order_id,
-                taker_order_id=order.order_id,
-                price=best.price,
-                quantity=traded,
-            ))
-            if best.is_filled:
-                # Removing the filled order from the book keeps subsequent lookups clean.
-                opposite.remove_order(best)
-                self._drop_order(best)
 
         # Decide whether any remainder should rest on the book.
-        if order.remaining_quantity > 0:
+        if order.remaining > 0:
             if order.time_in_force is TimeInForce.IOC:
-                events.append(OrderCancelled(
-                    order_id=order.order_id,
-                    remaining_quantity=order.remaining_quantity,
-                    reason="IOC remainder",
-                ))
+                emit((CANCELLED, order.order_id, order.remaining, "IOC remainder", next_seq(), now))
+                self._retire(order)
             else:
                 same_side.add(order)
                 self._orders[order.order_id] = order
-                events.append(OrderAccepted(order=order))
+                emit(_accepted(order, next_seq(), now))
         else:
             # Fully filled IOC orders never joined the book but we still want to acknowledge them.
-            events.append(OrderAccepted(order=order))
+            emit(_accepted(order, next_seq(), now))
+            self._retire(order)
         return events
 
-    def cancel(self, order_id: str, reason: str = "user_request") -> List[object]:
+    def cancel(self, order_id: int, reason: str = "user_request") -> List[object]:
         """Attempt to cancel an order by ID, returning the resulting event."""
 
+        return [to_event(record) for record in self.cancel_records(order_id, reason=reason)]
+
+    def cancel_records(self, order_id: int, reason: str = "user_request") -> List[tuple]:
+        """Tuple-record form of :meth:`cancel`."""
+
         order = self._orders.get(order_id)
         if not order:
-            return [OrderRejected(order_id=order_id, reason="unknown_order")]
+            return [(REJECTED, order_id, "unknown_order", self._next_seq(), time_ns())]
         side = self._bids if order.side is Side.BUY else self._asks
         side.remove_order(order)
         self._drop_order(order)
-        return [OrderCancelled(order_id=order_id, remaining_quantity=order.remaining_quantity, reason=reason)]
+        return [(CANCELLED, order_id, order.remaining, reason, self._next_seq(), time_ns())]
+
+    def replay(self, rows: Iterable[Tuple[int, int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        """Feed a pre-recorded order stream through the book and return only its trades.
+
+        Each row is ``(side, price, quantity, time_in_force, order_id)``: side is ``+1``/``-1``
+        (as :attr:`Order.side_sign`), price and quantity are integer ticks and time in force is
+        ``0`` for GTC or ``1`` for IOC. A NumPy structured array with those fields in that order
+        iterates as such rows. Trades come back as ``(maker_order_id, taker_order_id, price,
+        quantity)`` tuples in ticks and no event objects are built. To replay onto an
+        engine's book, go through :meth:`MatchingEngine.replay`.
+        """
+
+        trades: List[Tuple[int, int, int, int]] = []
+        add_trade = trades.append
+        submit = self.submit_records
+        sides, tifs = _REPLAY_SIDES, _REPLAY_TIFS
+        for side, price, quantity, time_in_force, order_id in rows:
+            # int() keeps foreign integer scalars (e.g. NumPy) from being read as decimals.
+            order = Order.from_ticks(
+                int(order_id), sides[side], int(price), int(quantity), time_in_force=tifs[time_in_force],
+            )
+            for record in submit(order):
+                if record[0] == TRADE:
+                    add_trade(record[1:5])
+        return trades
 
     def best_bid(self) -> Optional[Decimal]:
-        """Expose the highest bid for inspection/testing."""
+        """Expose the highest bid as a decimal price for inspection/testing."""
 
-        return self._bids.best_price()
+        price = self._bids.best_price()
+        return None if price is None else ticks_to_price(price)
 
     def best_ask(self) -> Optional[Decimal]:
-        """Expose the lowest ask for inspection/testing."""
+        """Expose the lowest ask as a decimal price for inspection/testing."""
 
-        return self._asks.best_price()
+        price = self._asks.best_price()
+        return None if price is None else ticks_to_price(price)
 
     def _drop_order(self, order: Order) -> None:
         """Remove an order from tracking once it is fully filled or cancelled."""
 
         if order.order_id in self._orders:
             del self._orders[order.order_id]
+        self._retire(order)
 
-    def _crosses(self, incoming: Order, contra_price: Decimal) -> bool:
-        """Check if an incoming order is marketable against the given contra price."""
+    def _retire(self, order: Order) -> None:
+        """Notify the retire hook that `order` is done with the book."""
 
-        if incoming.side is Side.BUY:
-            return incoming.price >= contra_price
-        return incoming.price <= contra_price
+        if self._on_retire is not None:
+            self._on_retire(order)
 
     def snapshot(self) -> Dict[str, List[Order]]:
         """Return a shallow view of current resting orders, grouped by side for debugging."""
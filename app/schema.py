@@ -1,5 +1,7 @@
 """Shared data structures and enumerations used across NyxEngine."""
 
+# Decimal is the external representation of prices/quantities at the API boundary.
+from decimal import MAX_PREC, Context, Decimal, InvalidOperation
 # Enum gives us symbolic, readable constants for shared attributes like side/type.
 from enum import Enum
 
@@ -22,3 +24,50 @@ class TimeInForce(str, Enum):
 
     GTC = "GTC"  # Good-Till-Cancelled (default behaviour)
     IOC = "IOC"  # Immediate-Or-Cancel (fill remainder immediately or cancel)
+
+
+# Fixed-point scales: prices and quantities travel through the engine as integer ticks.
+PRICE_SCALE = 10**8
+QTY_SCALE = 10**8
+
+# Unbounded precision so scaling never rounds; the exactness check below then sees every digit.
+_EXACT = Context(prec=MAX_PREC)
+
+
+def _to_ticks(value: Decimal, scale: int, name: str) -> int:
+    """Scale a decimal amount to integer ticks, refusing sub-tick precision."""
+
+    try:
+        amount = Decimal(value)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"{name} is not a number: {value!r}") from None
+    if not amount.is_finite():
+        raise ValueError(f"{name} must be finite")
+    scaled = _EXACT.multiply(amount, scale)
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"{name} has more precision than the engine supports")
+    return int(scaled)
+
+
+def price_to_ticks(price: Decimal) -> int:
+    """Convert an external decimal price into integer price ticks."""
+
+    return _to_ticks(price, PRICE_SCALE, "price")
+
+
+def qty_to_ticks(quantity: Decimal) -> int:
+    """Convert an external decimal quantity into integer lot ticks."""
+
+    return _to_ticks(quantity, QTY_SCALE, "quantity")
+
+
+def ticks_to_price(ticks: int) -> Decimal:
+    """Convert integer price ticks back to a decimal price for API consumers."""
+
+    return Decimal(ticks) / PRICE_SCALE
+
+
+def ticks_to_qty(ticks: int) -> Decimal:
+    """Convert integer lot ticks back to a decimal quantity for API consumers."""
+
+    return Decimal(ticks) / QTY_SCALE
@@ -2,21 +2,30 @@
 
 # collections.deque acts as a simple stand-in event bus sink we can inspect.
 from collections import deque
+# datetime checks the wall-clock stamp of events built outside the book.
+from datetime import datetime, timedelta, timezone
 # Decimal stays consistent with the pricing units used by the order book tests.
 from decimal import Decimal
+# gc lets the batch test observe the collector state.
+import gc
+
+# pytest.raises asserts on rejected pool arguments.
+import pytest
 
 # Import the orchestrator and order entity under test.
+from app.engine.events import ACCEPTED, REJECTED, TRADE, OrderAccepted, OrderCancelled, Trade, to_event
 from app.engine.matchine_engine import MatchingEngine
-from app.engine.order import Order
+from app.engine.order import Order, OrderPool
+from app.infra.bus import TypedEventSink
 # schema.Side enumerates the direction (buy/sell) needed for constructing orders.
-from app.schema import Side
+from app.schema import Side, TimeInForce, price_to_ticks, qty_to_ticks
 
 
-def make_order(order_id: str, side: Side, price: str, quantity: str) -> Order:
-    """Factory mirroring the helper in order book tests for cross-module reuse."""
+def make_order(engine: MatchingEngine, order_id: str, side: Side, price: str, quantity: str) -> Order:
+    """Factory mirroring the helper in order book tests, encoding IDs through the engine."""
 
     return Order(
-        order_id=order_id,
+        order_id=engine.ids.encode(order_id),
         side=side,
         price=Decimal(price),
         quantity=Decimal(quantity),
@@ -24,24 +33,215 @@ def make_order(order_id: str, side: Side, price: str, quantity: str) -> Order:
 
 
 def test_engine_publishes_events_to_sink():
+    sink = TypedEventSink()
+    engine = MatchingEngine(publish=sink)
+
+    ask = make_order(engine, "ask-1", Side.SELL, "100", "1")
+    bid = make_order(engine, "bid-1", Side.BUY, "101", "1")
+    engine.submit_order(ask)
+    engine.submit_order(bid)
+
+    assert len(sink.accepts) == 2
+    assert len(sink.trades) == 1
+    trade = sink.trades[0]
+    assert trade.maker_order_id == ask.order_id
+    assert trade.taker_order_id == bid.order_id
+
+
+def test_engine_cancel_produces_reject_for_unknown_id():
+    sink = TypedEventSink()
+    engine = MatchingEngine(publish_batch=sink.extend)
+
+    engine.cancel_order(engine.ids.lookup("missing"))
+
+    assert sink.rejects[0].reason == "unknown_order"
+
+
+def test_engine_recycles_spent_orders_through_pool():
+    pool = OrderPool()
+    engine = MatchingEngine(order_pool=pool)
+
+    ask = engine.new_order(order_id=engine.ids.encode("ask-1"), side=Side.SELL, price=Decimal("100"), quantity=Decimal("1"))
+    engine.submit_order(ask)
+    assert len(pool) == 0  # still resting
+
+    engine.submit_order(engine.new_order(
+        order_id=engine.ids.encode("bid-1"), side=Side.BUY, price=Decimal("100"), quantity=Decimal("1"),
+    ))
+    assert len(pool) == 2  # filled maker and taker both retired
+
+    reused = engine.new_order(order_id=engine.ids.encode("bid-2"), side=Side.BUY, price=Decimal("99"), quantity=Decimal("2"))
+    assert len(pool) == 1
+    assert engine.ids.decode(reused.order_id) == "bid-2"
+    assert reused.filled_quantity == 0
+    engine.submit_order(reused)
+    assert isinstance(engine.cancel_order(engine.ids.lookup("bid-2"))[0], OrderCancelled)
+    assert len(pool) == 2
+
+
+def test_engine_hands_each_call_events_to_batch_publisher():
+    batches = []
+    engine = MatchingEngine(publish_batch=batches.append)
+
+    engine.submit_order(make_order(engine, "ask-1", Side.SELL, "100", "1"))
+    engine.submit_order(make_order(engine, "ask-2", Side.SELL, "100", "1"))
+    engine.submit_order(make_order(engine, "bid-1", Side.BUY, "100", "2"))
+
+    assert len(batches) == 3
+    assert [type(event) for event in batches[2]] == [Trade, Trade, OrderAccepted]
+
+
+def test_engine_events_carry_increasing_sequence_numbers():
     bus = deque()
     engine = MatchingEngine(publish=bus.append)
 
-    engine.submit_order(make_order("ask-1", Side.SELL, "100", "1"))
-    engine.submit_order(make_order("bid-1", Side.BUY, "101", "1"))
+    engine.submit_order(make_order(engine, "ask-1", Side.SELL, "100", "1"))
+    engine.submit_order(make_order(engine, "bid-1", Side.BUY, "100", "1"))
+    engine.cancel_order(engine.ids.lookup("missing"))
 
-    assert len(bus) >= 3  # accept + trade + accept
-    trade_events = [event for event in bus if event.__class__.__name__ == "Trade"]
-    assert trade_events
-    trade = trade_events[0]
-    assert trade.maker_order_id == "ask-1"
-    assert trade.taker_order_id == "bid-1"
+    assert [event.seq for event in bus] == [1, 2, 3, 4]
+    assert bus[1].wall_time_ns == bus[2].wall_time_ns  # trade and accept share one clock read
+    assert bus[1].timestamp.tzinfo is not None
 
 
-def test_engine_cancel_produces_reject_for_unknown_id():
+def test_engine_can_publish_tuple_records_instead_of_events():
     bus = deque()
+    engine = MatchingEngine(publish=bus.append, typed_events=False)
+
+    ask = make_order(engine, "ask-1", Side.SELL, "100", "1")
+    bid = make_order(engine, "bid-1", Side.BUY, "101", "1")
+    engine.submit_order(ask)
+    engine.submit_order(bid)
+    engine.cancel_order(engine.ids.lookup("missing"))
+
+    assert [record[0] for record in bus] == [ACCEPTED, TRADE, ACCEPTED, REJECTED]
+    trade = bus[1]
+    assert trade[1:3] == (ask.order_id, bid.order_id)
+    assert trade[3:5] == (price_to_ticks(Decimal("100")), qty_to_ticks(Decimal("1")))
+    assert to_event(trade).price == Decimal("100")
+
+
+def test_engine_batch_suspends_and_restores_gc():
+    engine = MatchingEngine()
+
+    with engine.batch() as batch:
+        assert not gc.isenabled()
+        batch.submit_order(make_order(engine, "ask-1", Side.SELL, "100", "1"))
+
+    assert gc.isenabled()
+    assert engine.best_ask() == Decimal("100")
+
+
+def test_id_registry_round_trips_external_ids():
+    engine = MatchingEngine()
+
+    first = engine.ids.encode("client-a")
+    assert engine.ids.encode("client-a") == first
+    assert engine.ids.encode("client-b") != first
+    assert engine.ids.decode(first) == "client-a"
+    assert engine.ids.lookup("never-seen") is None
+
+
+def test_published_accept_is_unchanged_after_its_order_is_recycled():
+    sink = TypedEventSink()
+    pool = OrderPool()
+    engine = MatchingEngine(publish=sink, order_pool=pool)
+
+    engine.submit_order(engine.new_order(engine.ids.encode("ask-1"), Side.SELL, Decimal("100"), Decimal("1")))
+    engine.submit_order(engine.new_order(engine.ids.encode("bid-1"), Side.BUY, Decimal("100"), Decimal("1")))
+    accepted = sink.accepts[1]
+    before = (accepted.order_id, accepted.side, accepted.price, accepted.remaining_quantity)
+
+    # Both recycled orders get reused with different attributes.
+    engine.submit_order(engine.new_order(engine.ids.encode("ask-2"), Side.SELL, Decimal("250"), Decimal("3")))
+    engine.submit_order(engine.new_order(engine.ids.encode("ask-3"), Side.SELL, Decimal("260"), Decimal("4")))
+
+    assert (accepted.order_id, accepted.side, accepted.price, accepted.remaining_quantity) == before
+    assert before[1:] == (Side.BUY, Decimal("100"), Decimal("0"))
+
+
+def test_pool_ignores_orders_it_did_not_hand_out():
+    pool = OrderPool()
+    engine = MatchingEngine(order_pool=pool)
+
+    engine.submit_order(make_order(engine, "ask-1", Side.SELL, "100", "1"))
+    engine.submit_order(make_order(engine, "bid-1", Side.BUY, "100", "1"))
+
+    assert len(pool) == 0
+
+
+def test_events_built_outside_the_book_are_stamped_now():
+    trade = Trade(1, 2, Decimal("100"), Decimal("1"))
+
+    assert abs(trade.timestamp - datetime.now(timezone.utc)) < timedelta(seconds=5)
+    assert trade.timestamp is trade.timestamp  # rendered once, then cached
+
+
+def test_engine_releases_finished_ids_without_reusing_them():
+    bus = []
     engine = MatchingEngine(publish=bus.append)
 
-    events = list(engine.cancel_order("missing"))
+    engine.submit_order(make_order(engine, "bid-1", Side.BUY, "99", "1"))
+    freed = engine.ids.lookup("bid-1")
+    engine.cancel_order(freed)
+
+    assert engine.ids.lookup("bid-1") is None
+    assert len(engine.ids) == 0
+    assert engine.ids.encode("bid-2") != freed
+    # Stored events still decode to the client that placed the order.
+    assert [engine.ids.decode(event.order_id) for event in bus] == ["bid-1", "bid-1"]
+
+
+def test_engine_only_releases_ids_of_orders_it_submitted():
+    engine = MatchingEngine()
+    engine.submit_order(make_order(engine, "bid-1", Side.BUY, "99", "1"))
+    client_id = engine.ids.lookup("bid-1")
+
+    # An order placed on the book directly happens to share the client's integer ID.
+    foreign = Order(client_id, Side.SELL, Decimal("100"), Decimal("1"), time_in_force=TimeInForce.IOC)
+    engine.orderbook.submit(foreign)
+    engine.submit_order(make_order(engine, "ask-1", Side.SELL, "101", "1"))
+
+    assert engine.ids.lookup("bid-1") == client_id
+    assert isinstance(engine.cancel_order(client_id)[0], OrderCancelled)
+
+
+def test_engine_replay_keeps_client_ids_consistent():
+    engine = MatchingEngine()
+    engine.submit_order(make_order(engine, "bid-1", Side.BUY, "99", "2"))
+    engine.submit_order(make_order(engine, "bid-2", Side.BUY, "98", "1"))
+    filled, resting = engine.ids.lookup("bid-1"), engine.ids.lookup("bid-2")
+
+    # Replayed IDs share the client's integer ID space.
+    rows = [(-1, price_to_ticks(Decimal("99")), qty_to_ticks(Decimal("1")), 0, resting)] * 2
+    trades = engine.replay(rows)
+
+    assert trades == [(filled, resting, price_to_ticks(Decimal("99")), qty_to_ticks(Decimal("1")))] * 2
+    assert engine.ids.lookup("bid-1") is None
+    assert engine.ids.lookup("bid-2") == resting
+    assert engine.best_bid() == Decimal("98")
+    assert not engine._retired
+
+
+def test_pool_keeps_its_instance_when_arguments_are_rejected():
+    pool = OrderPool(size=1)
+
+    with pytest.raises(ArithmeticError):
+        pool.acquire(1, Side.BUY, Decimal("NaN"), 1, in_ticks=True)
+    with pytest.raises(ValueError):
+        pool.acquire(1, Side.BUY, "abc", Decimal("1"))
+
+    assert len(pool) == 1
+
+
+def test_typed_sink_files_subclasses_and_rejects_tuple_records():
+    class TaggedTrade(Trade):
+        pass
+
+    sink = TypedEventSink()
+    sink(TaggedTrade(1, 2, Decimal("100"), Decimal("1")))
+    assert len(sink.trades) == 1
 
-    assert events[0].reason == "unknown_order"
+    engine = MatchingEngine(publish=sink, typed_events=False)
+    with pytest.raises(TypeError, match="typed_events"):
+        engine.submit_order(make_order(engine, "bid-1", Side.BUY, "99", "1"))
@@ -3,17 +3,25 @@
 # Decimal keeps assertions deterministic for price/size comparisons.
 from decimal import Decimal
 
+# pytest.raises asserts on validation failures.
+import pytest
+
 # Import the subject under test and its supporting domain types.
+from app.engine.events import OrderCancelled
 from app.engine.order import Order
 from app.engine.orderbook import OrderBook
-from app.schema import Side, TimeInForce
+from app.infra.bus import TypedEventSink
+from app.schema import PRICE_SCALE, QTY_SCALE, Side, TimeInForce, price_to_ticks, qty_to_ticks
 
 
 def make_order(**overrides):
-    """Helper that constructs an order with reasonable defaults for tests."""
+    """Helper that constructs an order with reasonable defaults for tests.
+
+    Order IDs are plain ints; by convention asks use 1xx and bids 2xx.
+    """
 
     base = dict(
-        order_id=overrides.get("order_id", "order-1"),
+        order_id=overrides.get("order_id", 1),
         side=overrides.get("side", Side.BUY),
         price=overrides.get("price", Decimal("100")),
         quantity=overrides.get("quantity", Decimal("1")),
@@ -22,10 +30,18 @@ def make_order(**overrides):
     return Order(**base)
 
 
+def collect(events):
+    """Bucket the events returned by a book call by type."""
+
+    sink = TypedEventSink()
+    sink.extend(events)
+    return sink
+
+
 def test_limit_order_rests_when_no_contra_side():
     book = OrderBook()
 
-    events = book.submit(make_order(order_id="bid-1"))
+    events = book.submit(make_order(order_id=201))
 
     assert len(events) == 1
     assert book.best_bid() == Decimal("100")
@@ -35,14 +51,14 @@ def test_limit_order_rests_when_no_contra_side():
 def test_crossing_order_executes_and_clears_book():
     book = OrderBook()
 
-    book.submit(make_order(order_id="ask-1", side=Side.SELL))
-    events = book.submit(make_order(order_id="bid-1", side=Side.BUY, price=Decimal("101")))
+    book.submit(make_order(order_id=101, side=Side.SELL))
+    events = book.submit(make_order(order_id=201, side=Side.BUY, price=Decimal("101")))
 
-    trade_events = [event for event in events if event.__class__.__name__ == "Trade"]
+    trade_events = collect(events).trades
     assert len(trade_events) == 1
     trade = trade_events[0]
-    assert trade.maker_order_id == "ask-1"
-    assert trade.taker_order_id == "bid-1"
+    assert trade.maker_order_id == 101
+    assert trade.taker_order_id == 201
     assert trade.price == Decimal("100")
     assert trade.quantity == Decimal("1")
     assert book.best_bid() is None
@@ -52,34 +68,33 @@ def test_crossing_order_executes_and_clears_book():
 def test_partial_fill_leaves_remainder_on_book():
     book = OrderBook()
 
-    resting = make_order(order_id="ask-1", side=Side.SELL, quantity=Decimal("5"))
+    resting = make_order(order_id=101, side=Side.SELL, quantity=Decimal("5"))
     book.submit(resting)
 
-    events = book.submit(make_order(order_id="bid-1", side=Side.BUY, price=Decimal("100"), quantity=Decimal("2")))
+    events = book.submit(make_order(order_id=201, side=Side.BUY, price=Decimal("100"), quantity=Decimal("2")))
 
-    trade_events = [event for event in events if event.__class__.__name__ == "Trade"]
+    trade_events = collect(events).trades
     assert trade_events[0].quantity == Decimal("2")
-    assert resting.remaining_quantity == Decimal("3")
+    assert resting.remaining_quantity == qty_to_ticks(Decimal("3"))
     assert book.best_ask() == Decimal("100")
 
 
 def test_ioc_cancels_unfilled_remainder():
     book = OrderBook()
 
-    book.submit(make_order(order_id="ask-1", side=Side.SELL, quantity=Decimal("1")))
+    book.submit(make_order(order_id=101, side=Side.SELL, quantity=Decimal("1")))
 
     events = book.submit(make_order(
-        order_id="bid-1",
+        order_id=201,
         side=Side.BUY,
         price=Decimal("120"),
         quantity=Decimal("2"),
         time_in_force=TimeInForce.IOC,
     ))
 
-    trade_events = [event for event in events if event.__class__.__name__ == "Trade"]
-    cancel_events = [event for event in events if event.__class__.__name__ == "OrderCancelled"]
-    assert trade_events[0].quantity == Decimal("1")
-    assert cancel_events[0].remaining_quantity == Decimal("1")
+    sink = collect(events)
+    assert sink.trades[0].quantity == Decimal("1")
+    assert sink.cancels[0].remaining_quantity == Decimal("1")
     assert book.best_bid() is None
     assert book.best_ask() is None
 
@@ -87,7 +102,158 @@ def test_ioc_cancels_unfilled_remainder():
 def test_cancelling_unknown_order_is_rejected():
     book = OrderBook()
 
-    events = book.cancel("does-not-exist")
+    events = book.cancel(999)
 
     reject = events[0]
     assert reject.reason == "unknown_order"
+
+
+def test_order_amounts_are_stored_as_integer_ticks():
+    order = make_order(price=Decimal("100.25"), quantity=Decimal("0.5"))
+
+    assert isinstance(order.price, int)
+    assert order.quantity == QTY_SCALE // 2
+    with pytest.raises(ValueError):
+        make_order(price=Decimal("0.000000001"))
+
+
+def test_price_levels_are_kept_in_priority_order():
+    book = OrderBook()
+
+    for index, price in enumerate(("99", "101", "100")):
+        book.submit(make_order(order_id=200 + index, side=Side.BUY, price=Decimal(price)))
+        book.submit(make_order(order_id=100 + index, side=Side.SELL, price=Decimal(price) + 10))
+
+    snapshot = book.snapshot()
+    assert [order.order_id for order in snapshot["bids"]] == [201, 202, 200]
+    assert [order.order_id for order in snapshot["asks"]] == [100, 102, 101]
+    assert book.best_bid() == Decimal("101")
+    assert book.best_ask() == Decimal("109")
+
+
+def test_aggressive_order_sweeps_levels_and_book_tracks_new_best():
+    book = OrderBook()
+
+    book.submit(make_order(order_id=101, side=Side.SELL, price=Decimal("100")))
+    book.submit(make_order(order_id=102, side=Side.SELL, price=Decimal("101")))
+    book.submit(make_order(order_id=103, side=Side.SELL, price=Decimal("102")))
+
+    events = book.submit(make_order(order_id=201, side=Side.BUY, price=Decimal("101"), quantity=Decimal("3")))
+
+    trades = collect(events).trades
+    assert [trade.maker_order_id for trade in trades] == [101, 102]
+    assert book.best_bid() == Decimal("101")
+    assert book.best_ask() == Decimal("102")
+
+    # A better ask arriving after the top of book was cached must take over.
+    book.submit(make_order(order_id=104, side=Side.SELL, price=Decimal("101.5")))
+    assert book.best_ask() == Decimal("101.5")
+
+
+def test_cancel_from_middle_of_level_preserves_queue_order():
+    book = OrderBook()
+
+    for order_id in (101, 102, 103):
+        book.submit(make_order(order_id=order_id, side=Side.SELL))
+
+    cancel = book.cancel(102)[0]
+    assert isinstance(cancel, OrderCancelled)
+    assert [order.order_id for order in book.snapshot()["asks"]] == [101, 103]
+    assert book.cancel(102)[0].reason == "unknown_order"
+
+    book.cancel(101)
+    book.cancel(103)
+    assert book.best_ask() is None
+
+
+def test_taker_walks_queue_within_a_level_in_time_priority():
+    book = OrderBook()
+
+    first = make_order(order_id=101, side=Side.SELL, quantity=Decimal("1"))
+    second = make_order(order_id=102, side=Side.SELL, quantity=Decimal("2"))
+    book.submit(first)
+    book.submit(second)
+
+    events = book.submit(make_order(order_id=201, side=Side.BUY, quantity=Decimal("2")))
+
+    trades = collect(events).trades
+    assert [(trade.maker_order_id, trade.quantity) for trade in trades] == [(101, 1), (102, 1)]
+    assert first.is_filled
+    assert second.remaining_quantity == qty_to_ticks(Decimal("1"))
+    assert [order.order_id for order in book.snapshot()["asks"]] == [102]
+
+
+def test_level_queue_survives_interleaved_fills_and_cancels():
+    book = OrderBook()
+
+    for index in range(6):
+        book.submit(make_order(order_id=100 + index, side=Side.SELL))
+    book.cancel(101)
+    book.cancel(104)
+
+    events = book.submit(make_order(order_id=201, side=Side.BUY, quantity=Decimal("3")))
+
+    trades = collect(events).trades
+    assert [trade.maker_order_id for trade in trades] == [100, 102, 103]
+    assert [order.order_id for order in book.snapshot()["asks"]] == [105]
+    book.cancel(105)
+    assert book.best_ask() is None
+
+
+def test_apply_fill_tracks_remaining_and_filled_quantities():
+    order = make_order(quantity=Decimal("2"))
+
+    assert order.remaining == order.quantity
+    applied = order.apply_fill(qty_to_ticks(Decimal("5")))
+
+    assert applied == qty_to_ticks(Decimal("2"))
+    assert order.remaining == 0
+    assert order.filled_quantity == order.quantity
+    assert order.is_filled
+
+
+def test_sell_taker_only_hits_bids_at_or_above_its_limit():
+    book = OrderBook()
+
+    book.submit(make_order(order_id=201, side=Side.BUY, price=Decimal("100")))
+    book.submit(make_order(order_id=202, side=Side.BUY, price=Decimal("99")))
+
+    events = book.submit(make_order(order_id=101, side=Side.SELL, price=Decimal("100"), quantity=Decimal("2")))
+
+    trades = collect(events).trades
+    assert [trade.maker_order_id for trade in trades] == [201]
+    assert book.best_bid() == Decimal("99")
+    assert book.best_ask() == Decimal("100")
+
+
+def test_replay_returns_trade_rows_in_ticks():
+    book = OrderBook()
+    price = PRICE_SCALE * 100
+    lot = QTY_SCALE
+
+    trades = book.replay([
+        (-1, price, 2 * lot, 0, 101),      # resting ask
+        (1, price - 1, lot, 0, 201),       # bid below the ask rests too
+        (1, price, 3 * lot, 1, 202),       # IOC bid lifts the ask, remainder cancelled
+        (-1, price - 1, lot, 0, 102),      # ask hits the resting bid
+    ])
+
+    assert trades == [(101, 202, price, 2 * lot), (201, 102, price - 1, lot)]
+    assert book.best_bid() is None
+    assert book.best_ask() is None
+
+
+def test_plain_int_amounts_are_external_units_not_ticks():
+    book = OrderBook()
+
+    book.submit(Order(101, Side.SELL, 100, 5))
+
+    assert book.best_ask() == Decimal("100")
+    assert Order.from_ticks(102, Side.SELL, PRICE_SCALE * 100, QTY_SCALE).price == PRICE_SCALE * 100
+
+
+def test_tick_conversion_rejects_rounding_and_non_finite_amounts():
+    assert price_to_ticks(Decimal("123456789012345678901.23456789")) == 12345678901234567890123456789
+    for bad in (Decimal("123456789012345678901.234567891"), Decimal("Infinity"), Decimal("NaN"), "abc"):
+        with pytest.raises(ValueError):
+            price_to_ticks(bad)